@@ -1,14 +1,30 @@
 # file: benchmark_speedup_fragmented_and_realworld.py
+import argparse
 import os
+import functools
 import glob
 import subprocess
 import time
 import hashlib
+import json
+import mmap
+import queue
 import random
-from typing import Dict, List, Tuple, Callable
+import shutil
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple, Callable, Union
+import numpy as np
+try:
+    from blake3 import blake3 as _blake3  # optional: SIMD, multi-threaded hashing
+except ImportError:
+    _blake3 = None
 import matplotlib
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
 
 # ---- Config ----
 GO_EXE = "pczip"
@@ -17,7 +33,23 @@ if os.name == "nt":
 
 FILE_SIZE_MB = 512
 THREAD_COUNTS: List[int] = [2, 4, 6, 8, 12]
-ITERATIONS = 3
+# Each (impl, threads) cell runs at least MIN_ITERATIONS times and keeps
+# sampling until the coefficient of variation is below COV_TOLERANCE, up to
+# MAX_ITERATIONS.
+MIN_ITERATIONS = 2
+MAX_ITERATIONS = 6
+COV_TOLERANCE = 0.03
+
+# Bump GENERATOR_VERSION whenever a generator's output changes so stale
+# cached datasets are not reused.
+DATASET_SEED = 0xC0DE
+GENERATOR_VERSION = 5
+SEQ_CACHE_FILE = "seq_times.json"
+
+# Pin pczip to as many cores as it has threads (Linux) and cap GOMAXPROCS to
+# match, so the OS doesn't migrate it and Go doesn't exceed the requested
+# parallelism.
+PIN_CPUS = True
 
 # (flag used by CLI, human-readable label)
 PARALLEL_IMPLS: List[Tuple[str, str]] = [
@@ -31,12 +63,17 @@ DATASETS: List[Tuple[str, str]] = [
     ("realworld_mixed", "Mixed: text+JSON+zeros+media-like+random"),
 ]
 
+# why: filler only needs to be incompressible, not cryptographic.
+_RNG = np.random.default_rng(DATASET_SEED)
+
 # ---- Helpers ----
 def _exe_path() -> str:
     return GO_EXE if os.name == "nt" else f"./{GO_EXE}"
 
-def _dataset_path(dataset_key: str) -> str:
-    return f"{dataset_key}.bin"
+def _dataset_path(dataset_key: str, dense: bool = False) -> str:
+    """why: name encodes everything that determines content, so it doubles as a cache key."""
+    suffix = "_dense" if dense else ""
+    return f"{dataset_key}_{FILE_SIZE_MB}MB_s{DATASET_SEED:x}_v{GENERATOR_VERSION}{suffix}.bin"
 
 def compile_go() -> None:
     try:
@@ -44,81 +81,188 @@ def compile_go() -> None:
     except subprocess.CalledProcessError as exc:
         raise SystemExit(1)
 
-def _md5sum(fname: str) -> str:
-    h = hashlib.md5()
+def _fast_hash(fname: str) -> str:
+    """BLAKE3 over an mmap of the file; MD5 when blake3 is not installed."""
     with open(fname, "rb") as f:
-        for chunk in iter(lambda: f.read(1 << 20), b""):
-            h.update(chunk)
-    return h.hexdigest()
+        if os.fstat(f.fileno()).st_size == 0:  # why: mmap rejects empty files
+            return (_blake3() if _blake3 is not None else hashlib.md5()).hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _blake3 is not None:
+                return _blake3(mm, max_threads=_blake3.AUTO).hexdigest()
+            return hashlib.md5(mm).hexdigest()
+
+_md5sum = _fast_hash  # old name, kept for existing callers
+
+_HASH_ALGO = "blake3" if _blake3 is not None else "md5"  # what _fast_hash computes
+
+def _reseed(seed: int) -> None:
+    """why: same (kind, seed) must reproduce the same bytes."""
+    global _RNG
+    _RNG = np.random.default_rng(seed)
+
+def _fast_random_bytes(n: int, rng: Optional[np.random.Generator] = None) -> bytes:
+    """User-space PRNG fill; far cheaper than os.urandom for bulk filler."""
+    return (_RNG if rng is None else rng).bytes(n)
+
+# Payloads may be zero-copy views into cached buffers.
+_Buffer = Union[bytes, memoryview]
+
+def _pwrite_all(fd: int, payload: _Buffer, offset: int) -> None:
+    view = memoryview(payload)
+    while view:
+        n = os.pwrite(fd, view, offset)
+        view = view[n:]
+        offset += n
+
+def _write_all(fd: int, payload: _Buffer) -> None:
+    view = memoryview(payload)
+    while view:
+        view = view[os.write(fd, view):]
+
+def _zero_regions(offset: int, size: int) -> Iterable[Tuple[int, _Buffer]]:
+    """(offset, payload) slabs that write `size` zero bytes densely."""
+    slab = memoryview(bytes(min(size, 64 * 1024 * 1024)))
+    end = offset + size
+    while offset < end:
+        n = min(len(slab), end - offset)
+        yield offset, slab[:n]
+        offset += n
+
+def _write_pipelined(fd: int, regions: Iterable[Tuple[int, _Buffer]]) -> None:
+    """Write (offset, payload) pairs on a background thread while the caller
+    produces the next payload, so generation and write I/O overlap."""
+    q: "queue.Queue[Optional[Tuple[int, _Buffer]]]" = queue.Queue(maxsize=2)
+    failures: List[OSError] = []
+
+    def _writer() -> None:
+        while True:
+            item = q.get()
+            if item is None:
+                return
+            if failures:
+                continue  # why: keep draining so the producer never blocks
+            offset, payload = item
+            try:
+                os.lseek(fd, offset, os.SEEK_SET)
+                _write_all(fd, payload)
+            except OSError as exc:
+                failures.append(exc)
+
+    writer = threading.Thread(target=_writer, daemon=True)
+    writer.start()
+    try:
+        for region in regions:
+            q.put(region)
+    finally:
+        q.put(None)
+        writer.join()
+    if failures:
+        raise failures[0]
 
 # ---- Dataset generators ----
-def gen_fragmented(path: str, size_mb: int) -> None:
-    """why: mimics sparse disk regions with random 'islands'."""
+def gen_fragmented(path: str, size_mb: int, dense: bool = False) -> None:
+    """why: mimics sparse disk regions with random 'islands'.
+
+    The zero gap is a sparse hole unless dense is set; holes read back
+    without disk I/O, which matters for --cold timings.
+    """
     if os.path.exists(path):
         os.remove(path)
     total_size = size_mb * 1024 * 1024
     island_size = int((total_size * 0.20) / 2)
     gap_size = total_size - (island_size * 2)
-    with open(path, "wb") as f:
-        f.write(os.urandom(island_size))
-        chunk = 10 * 1024 * 1024
-        zero_block = b"\x00" * chunk
-        written = 0
-        while written < gap_size:
-            towrite = min(chunk, gap_size - written)
-            f.write(zero_block[:towrite])
-            written += towrite
-        f.write(os.urandom(island_size))
-
-def _write_repeat(f, pattern: bytes, length: int) -> None:
-    """why: avoid huge allocations for long runs."""
-    buf = pattern
-    remaining = length
-    while remaining > 0:
-        w = min(len(buf), remaining)
-        f.write(buf[:w])
-        remaining -= w
-
-def _make_text_block(block_bytes: int) -> bytes:
-    line = (b"The quick brown fox jumps over the lazy dog. "
-            b"lorem ipsum dolor sit amet, consectetur adipiscing elit. ")
-    out = bytearray()
-    while len(out) + len(line) + 1 <= block_bytes:
-        out.extend(line)
-        out.append(0x0A)
-    if len(out) < block_bytes:
-        out.extend(line[: block_bytes - len(out)])
-    return bytes(out)
-
-def _make_jsonlog_block(block_bytes: int) -> bytes:
+    _reseed(DATASET_SEED)
+    def _regions() -> Iterable[Tuple[int, _Buffer]]:
+        yield 0, _fast_random_bytes(island_size)
+        if dense:
+            yield from _zero_regions(island_size, gap_size)
+        # why: otherwise skipping the gap leaves a sparse hole that reads back as zeros.
+        yield island_size + gap_size, _fast_random_bytes(island_size)
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        _write_pipelined(fd, _regions())
+    finally:
+        os.close(fd)
+
+_TEXT_LINE = (b"The quick brown fox jumps over the lazy dog. "
+              b"lorem ipsum dolor sit amet, consectetur adipiscing elit. ")
+_TEXT_POOL_BYTES = 16 * 1024 * 1024
+
+def _build_text(block_bytes: int) -> bytes:
+    # why: line length is fixed, so size the body up front and fill it in C.
+    line_nl = _TEXT_LINE + b"\n"
+    body = line_nl * (block_bytes // len(line_nl))
+    return body + _TEXT_LINE[: block_bytes - len(body)]
+
+@functools.lru_cache(maxsize=4)
+def _text_pool(size: int) -> bytes:
+    return _build_text(size)
+
+def _make_text_block(block_bytes: int) -> memoryview:
+    # why: text is line-periodic, so any block is a prefix of one shared pool;
+    # returning a view writes it without copying the slice first.
+    if block_bytes > _TEXT_POOL_BYTES:
+        return memoryview(_build_text(block_bytes))
+    return memoryview(_text_pool(_TEXT_POOL_BYTES))[:block_bytes]
+
+# why: pre-encoded bytes + bytes %-formatting skip per-line str encoding.
+_LEVELS = (b"INFO", b"WARN", b"ERROR", b"DEBUG")
+_MSGS = (
+    b"connected", b"disconnected", b"timeout", b"retrying", b"ok",
+    b"downloaded", b"uploaded", b"cached", b"evicted", b"committed",
+)
+_JSONLOG_LINE = b'{"ts":%d,"level":"%s","user":%d,"msg":"%s","ok":true}\n'
+_JSONLOG_MIN_LINE = len(_JSONLOG_LINE % (1700000000, min(_LEVELS, key=len), 1, min(_MSGS, key=len)))
+
+def _make_jsonlog_block(block_bytes: int, rng: Optional[np.random.Generator] = None) -> bytes:
     # Structured, repetitive keys with mild variance.
-    out = bytearray()
-    i = 0
-    while len(out) < block_bytes:
-        lvl = random.choice(("INFO", "WARN", "ERROR", "DEBUG"))
-        uid = random.randint(1, 10000)
-        msg = random.choice((
-            "connected", "disconnected", "timeout", "retrying", "ok",
-            "downloaded", "uploaded", "cached", "evicted", "committed"
-        ))
-        line = (f'{{"ts":{1700000000+i},"level":"{lvl}","user":{uid},'
-                f'"msg":"{msg}","ok":true}}\n').encode("utf-8")
-        if len(out) + len(line) > block_bytes:
-            out.extend(line[: block_bytes - len(out)])
-            break
-        out.extend(line)
-        i += 1
-    return bytes(out)
-
-def _make_media_like_block(block_bytes: int) -> bytes:
-    # Header-like repetition + noisy body.
-    header = b"\x89MEDIAHDR" + os.urandom(56)  # fixed-ish header region
-    header = (header * ((1024 // len(header)) + 1))[:1024]
-    noisy = os.urandom(max(0, block_bytes - len(header)))
-    return header + noisy
+    # why: draw all random fields in one vector call instead of per line.
+    rng = _RNG if rng is None else rng
+    n = block_bytes // _JSONLOG_MIN_LINE + 1
+    lvl_idx = rng.integers(0, len(_LEVELS), n).tolist()
+    uids = rng.integers(1, 10001, n).tolist()
+    msg_idx = rng.integers(0, len(_MSGS), n).tolist()
+    lines = [
+        _JSONLOG_LINE % (1700000000 + i, _LEVELS[lvl], uid, _MSGS[msg])
+        for i, (lvl, uid, msg) in enumerate(zip(lvl_idx, uids, msg_idx))
+    ]
+    return b"".join(lines)[:block_bytes]
 
-def gen_realworld_mixed(path: str, size_mb: int) -> None:
-    """why: mixes compressible and incompressible regions like real corpora."""
+# Fixed-ish header region shared by every media-like block.
+_MEDIA_HEADER = ((b"\x89MEDIAHDR" + np.random.default_rng(DATASET_SEED).bytes(56)) * 16)[:1024]
+
+def _make_media_like_block(block_bytes: int, rng: Optional[np.random.Generator] = None) -> bytes:
+    # Header-like repetition + noisy body.
+    noisy = _fast_random_bytes(max(0, block_bytes - len(_MEDIA_HEADER)), rng)
+    return _MEDIA_HEADER + noisy
+
+def _make_region(kind: str, size: int, seed: int, dense: bool = False) -> Optional[_Buffer]:
+    """Payload for one planned region, or None for zeros left as a sparse hole."""
+    # why: a private generator per region keeps output independent of thread order.
+    rng = np.random.default_rng(seed)
+    if kind == "zeros":
+        return bytes(size) if dense else None
+    if kind == "text":
+        return _make_text_block(size)
+    if kind == "json":
+        return _make_jsonlog_block(size, rng)
+    if kind == "media":
+        return _make_media_like_block(size, rng)
+    # why: incompressible areas (e.g., encrypted/media tail)
+    return _fast_random_bytes(size, rng)
+
+def _write_region(fd: int, region: Tuple[int, int, str, int], dense: bool = False) -> None:
+    offset, size, kind, seed = region
+    payload = _make_region(kind, size, seed, dense)
+    if payload is not None:
+        _pwrite_all(fd, payload, offset)
+
+def gen_realworld_mixed(path: str, size_mb: int, dense: bool = False) -> None:
+    """why: mixes compressible and incompressible regions like real corpora.
+
+    Zero regions are sparse holes unless dense is set.
+    """
     if os.path.exists(path):
         os.remove(path)
     random.seed(42)  # reproducible layout
@@ -127,59 +271,279 @@ def gen_realworld_mixed(path: str, size_mb: int) -> None:
     kinds = ("zeros", "text", "json", "media", "random")
     # Rough proportions: zeros(25), text(20), json(20), media(20), random(15)
     weights = (25, 20, 20, 20, 15)
-    with open(path, "wb") as f:
-        written = 0
-        while written < total:
-            bsz = min(block, total - written)
-            kind = random.choices(kinds, weights=weights, k=1)[0]
-            if kind == "zeros":
-                _write_repeat(f, b"\x00" * min(1_048_576, bsz), bsz)
-            elif kind == "text":
-                f.write(_make_text_block(bsz))
-            elif kind == "json":
-                f.write(_make_jsonlog_block(bsz))
-            elif kind == "media":
-                f.write(_make_media_like_block(bsz))
-            else:  # random
-                # why: incompressible areas (e.g., encrypted/media tail)
-                chunk = 10 * 1024 * 1024
-                togo = bsz
-                while togo > 0:
-                    w = min(chunk, togo)
-                    f.write(os.urandom(w))
-                    togo -= w
-            written += bsz
-
-GENERATOR_BY_KEY: Dict[str, Callable[[str, int], None]] = {
+
+    # Plan the layout up front so regions can be generated and written in parallel.
+    plan: List[Tuple[int, int, str, int]] = []
+    offset = 0
+    while offset < total:
+        bsz = min(block, total - offset)
+        kind = random.choices(kinds, weights=weights, k=1)[0]
+        plan.append((offset, bsz, kind, DATASET_SEED + offset))
+        offset += bsz
+
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0), 0o644)
+    try:
+        # why: size the file sparsely so zero regions stay holes, and only
+        # reserve space for regions that will actually be written.
+        os.ftruncate(fd, total)
+        if hasattr(os, "posix_fallocate"):
+            try:
+                for offset, bsz, kind, _ in plan:
+                    if dense or kind != "zeros":
+                        os.posix_fallocate(fd, offset, bsz)
+            except OSError:
+                pass  # why: preallocation is only a hint; unsupported on some filesystems
+        if hasattr(os, "pwrite"):
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+                list(ex.map(functools.partial(_write_region, fd, dense=dense), plan))
+        else:  # e.g. Windows: no pwrite, write regions in order behind generation
+            _write_pipelined(fd, ((offset, _make_region(kind, bsz, seed, dense))
+                                  for offset, bsz, kind, seed in plan
+                                  if dense or kind != "zeros"))
+    finally:
+        os.close(fd)
+
+GENERATOR_BY_KEY: Dict[str, Callable[[str, int, bool], None]] = {
     "fragmented": gen_fragmented,
     "realworld_mixed": gen_realworld_mixed,
 }
 
+def _remove_stale_datasets(dataset_key: str, keep: str, dense: bool) -> None:
+    """Delete cached copies from other sizes, seeds or generator versions.
+
+    Only files of the same density are touched, so the sparse and --cold copies
+    of a dataset can coexist.
+    """
+    for stale in glob.glob(f"{dataset_key}_*MB_*.bin"):
+        if stale == keep or stale.endswith("_dense.bin") != dense:
+            continue
+        for leftover in (stale, f"{stale}.digest"):
+            if os.path.exists(leftover):
+                os.remove(leftover)
+
+def ensure_dataset(dataset_key: str, dense: bool = False) -> Tuple[str, str]:
+    """Return (path, digest), regenerating only if the cached copy is missing or corrupt."""
+    path = _dataset_path(dataset_key, dense)
+    _remove_stale_datasets(dataset_key, path, dense)
+    sidecar = f"{path}.digest"
+    if os.path.exists(path) and os.path.exists(sidecar):
+        with open(sidecar, "r") as f:
+            algo, _, expected = f.read().strip().rpartition(":")
+        digest = _fast_hash(path)
+        if algo != _HASH_ALGO:
+            # why: written by the other hash (blake3 (un)installed since) or by
+            # an older version without the algo prefix; the file itself is fine.
+            _write_digest(sidecar, digest)
+            return path, digest
+        if digest == expected:
+            return path, digest
+    if os.path.exists(sidecar):
+        os.remove(sidecar)
+    GENERATOR_BY_KEY[dataset_key](path, FILE_SIZE_MB, dense)
+    digest = _fast_hash(path)
+    _write_digest(sidecar, digest)
+    return path, digest
+
+def _write_digest(sidecar: str, digest: str) -> None:
+    with open(sidecar, "w") as f:
+        f.write(f"{_HASH_ALGO}:{digest}\n")
+
+def _results_path(dataset_key: str) -> str:
+    return f"results_{dataset_key}.json"
+
+def save_results(dataset_key: str, dataset_label: str, seq_time: float,
+                 speedups_by_impl: Dict[str, List[float]], labels_by_impl: Dict[str, str],
+                 runs_by_impl: Dict[str, List[int]], mode: str) -> Dict:
+    """Write one dataset's measurements to results_<dataset>.json and return them."""
+    results = {
+        "dataset": dataset_key,
+        "label": dataset_label,
+        "size_mb": FILE_SIZE_MB,
+        "seq_time": seq_time,
+        "mode": mode,
+        "impls": {
+            impl_key: {
+                "label": labels_by_impl[impl_key],
+                "threads": THREAD_COUNTS,
+                "speedups": speedups,
+                "n_runs": runs_by_impl[impl_key],
+            }
+            for impl_key, speedups in speedups_by_impl.items()
+        },
+    }
+    with open(_results_path(dataset_key), "w") as f:
+        json.dump(results, f, indent=2)
+    return results
+
+def _measurement_mode(cold: bool) -> str:
+    """Settings that change what a timing means (page cache, timing source, pinning)."""
+    return ",".join((
+        "cold" if cold else "warm",
+        "server" if _SERVER is not None else "spawn",
+        "pinned" if _pinning_applies() else "unpinned",
+    ))
+
+def _seq_cache_key(dataset_digest: str, exe_digest: str, mode: str) -> str:
+    """why: a seq time is only comparable with parallel times from the same
+    input, the same pczip build and the same measurement mode."""
+    return f"{dataset_digest}:{exe_digest}:{mode}"
+
+def _load_seq_cache() -> Dict[str, float]:
+    if not os.path.exists(SEQ_CACHE_FILE):
+        return {}
+    try:
+        with open(SEQ_CACHE_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def _save_seq_cache(cache: Dict[str, float]) -> None:
+    with open(SEQ_CACHE_FILE, "w") as f:
+        json.dump(cache, f, indent=2)
+
+def prepare_datasets(dense: bool = False) -> Dict[str, Tuple[str, str]]:
+    """Generate (or reuse) every dataset up front; return {key: (path, digest)}."""
+    # why: generators use every core and saturate the disk, so they run one at
+    # a time and never alongside a timed run or each other.
+    return {key: ensure_dataset(key, dense) for key, _ in DATASETS}
+
 # ---- Benchmarking ----
-def run_compress(in_file: str, impl: str, threads: int, output_file: str) -> Tuple[float, float]:
+_SERVER: Optional[subprocess.Popen] = None
+
+def start_server() -> None:
+    """Keep one pczip -server alive for all timings; fall back to spawning on failed handshake."""
+    global _SERVER
+    try:
+        proc = subprocess.Popen([_exe_path(), "-server"], stdin=subprocess.PIPE,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError:
+        return
+    try:
+        ready = json.loads(proc.stdout.readline()).get("ready") is True
+    except ValueError:
+        ready = False
+    if not ready:
+        proc.kill()
+        proc.wait()
+        return
+    _SERVER = proc
+
+def stop_server() -> None:
+    global _SERVER
+    if _SERVER is None:
+        return
+    _SERVER.stdin.close()
+    _SERVER.wait()
+    _SERVER = None
+
+def _pinned_cpus(threads: int) -> List[int]:
+    """First `threads` CPUs this process is allowed to run on."""
+    return sorted(os.sched_getaffinity(0))[:max(1, threads)]
+
+def _affinity_prefix(threads: int) -> List[str]:
+    """taskset prefix for a spawned pczip; empty where unsupported."""
+    if not PIN_CPUS or not hasattr(os, "sched_getaffinity") or shutil.which("taskset") is None:
+        return []
+    return ["taskset", "-c", ",".join(str(c) for c in _pinned_cpus(threads))]
+
+def _pin_process(pid: int, threads: int) -> None:
+    """Pin every thread of a running process; threads it creates later inherit the mask."""
+    if not PIN_CPUS or not hasattr(os, "sched_setaffinity"):
+        return
+    cpus = _pinned_cpus(threads)
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return
+    for tid in tids:
+        try:
+            os.sched_setaffinity(int(tid), cpus)
+        except OSError:
+            pass  # why: thread exited between listing and pinning
+
+def _pinning_applies() -> bool:
+    """Whether runs actually get a CPU mask, not just whether PIN_CPUS asks for one."""
+    if _SERVER is not None:
+        return PIN_CPUS and hasattr(os, "sched_setaffinity") and os.path.isdir(f"/proc/{_SERVER.pid}/task")
+    return bool(_affinity_prefix(1))
+
+def _server_compress(in_file: str, impl: str, threads: int, output_file: str) -> Dict[str, int]:
+    """Run one job on the persistent server; return its reply (elapsed_ns, comp_bytes)."""
+    req = {"mode": "compress", "in": in_file, "out": output_file, "impl": impl, "threads": threads}
+    if PIN_CPUS:
+        req["gomaxprocs"] = threads
+    _pin_process(_SERVER.pid, threads)  # why: server is idle here, so no threads are being spawned
+    _SERVER.stdin.write((json.dumps(req) + "\n").encode("utf-8"))
+    _SERVER.stdin.flush()
+    line = _SERVER.stdout.readline()
+    if not line:
+        raise RuntimeError("pczip server exited unexpectedly")
+    reply = json.loads(line)
+    if reply.get("error"):
+        raise RuntimeError(f"pczip server: {reply['error']}")
+    return reply
+
+def run_compress(in_file: str, impl: str, threads: int, output_file: str,
+                 orig_size: int) -> Tuple[float, float]:
     """Return (duration_seconds, compression_ratio). Keep artifact; cleaned later."""
     if os.path.exists(output_file):
         os.remove(output_file)
-    start = time.time()
-    cmd = [
-        _exe_path(), "-mode", "compress", "-in", in_file,
-        "-out", output_file, "-impl", impl, "-threads", str(threads),
-    ]
-    try:
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-    except subprocess.CalledProcessError as exc:
-        raise
-    duration = time.time() - start
+    if _SERVER is not None:
+        reply = _server_compress(in_file, impl, threads, output_file)
+    else:
+        start = time.perf_counter_ns()
+        cmd = _affinity_prefix(threads) + [
+            _exe_path(), "-mode", "compress", "-in", in_file,
+            "-out", output_file, "-impl", impl, "-threads", str(threads),
+        ]
+        env = dict(os.environ, GOMAXPROCS=str(threads)) if PIN_CPUS else None
+        try:
+            proc = subprocess.run(cmd, check=True, capture_output=True, env=env)
+        except subprocess.CalledProcessError as exc:
+            raise
+        reply = {"elapsed_ns": time.perf_counter_ns() - start}
+        # why: prefer pczip's own timing; it excludes fork/exec and runtime init.
+        lines = proc.stdout.strip().splitlines()
+        if lines:
+            try:
+                reply.update(json.loads(lines[-1]))
+            except ValueError:
+                pass
+    duration = reply["elapsed_ns"] / 1e9
     ratio = 0.0
-    if os.path.exists(output_file):
-        orig_size = os.path.getsize(in_file)
-        comp_size = os.path.getsize(output_file)
-        if comp_size > 0:
-            ratio = orig_size / comp_size  # why: catch anomalies
+    comp_size = reply.get("comp_bytes", 0)
+    if comp_size > 0:
+        ratio = orig_size / comp_size  # why: catch anomalies
     return duration, ratio
 
-def verify_integrity(in_file: str, compressed_file: str) -> bool:
-    """Decompress with 'seq' and MD5-check against original."""
+def _adaptive_runs(fn: Callable[[int], float], min_n: int = MIN_ITERATIONS,
+                   max_n: int = MAX_ITERATIONS, tol: float = COV_TOLERANCE) -> List[float]:
+    """Call fn(i) until stdev/mean < tol (after min_n runs) or max_n runs; return samples."""
+    samples: List[float] = []
+    while len(samples) < max_n:
+        samples.append(fn(len(samples)))
+        if len(samples) >= min_n:
+            mean = statistics.fmean(samples)
+            if mean > 0 and statistics.stdev(samples) / mean < tol:
+                break
+    return samples
+
+def warm_page_cache(path: str) -> None:
+    """Read the file once so the first timed iteration doesn't pay cold I/O."""
+    buf = bytearray(1 << 22)
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        while f.readinto(buf):
+            pass
+
+def drop_page_cache() -> None:
+    """Linux only; needs sudo. Used by --cold for I/O-inclusive measurements."""
+    subprocess.run(["sudo", "sh", "-c", "sync; echo 3 > /proc/sys/vm/drop_caches"],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def verify_integrity(in_file: str, compressed_file: str, in_digest: Optional[str] = None) -> bool:
+    """Decompress with 'seq' and hash-check against original (or its known digest)."""
     out = "check_integrity.bin"
     if os.path.exists(out):
         os.remove(out)
@@ -191,7 +555,7 @@ def verify_integrity(in_file: str, compressed_file: str) -> bool:
             os.remove(out)
         return False
     try:
-        ok = _md5sum(in_file) == _md5sum(out)
+        ok = (in_digest or _fast_hash(in_file)) == _fast_hash(out)
     finally:
         if os.path.exists(out):
             os.remove(out)
@@ -212,87 +576,180 @@ def delete_all_pcz(tracked: List[str]) -> None:
             pass
 
 # ---- Plotting ----
-def plot_speedup_for_impl(dataset_key: str, dataset_label: str,
+# why: one Figure/Axes pair is reused for every plot; saving with a fixed
+# bbox avoids the second render pass that bbox_inches="tight" costs.
+def plot_speedup_for_impl(fig: Figure, ax: Axes, dataset_key: str, dataset_label: str,
                           impl_key: str, impl_label: str,
-                          thread_counts: List[int], speedups: List[float]) -> str:
-    plt.figure(figsize=(10, 6))
-    plt.plot(thread_counts, speedups, marker="o", linestyle="-", label=impl_label)
-    plt.axhline(y=1.0, linestyle=":", label="Sequential baseline")
-    plt.title(f"Speedup: {impl_label} on {dataset_label} ({FILE_SIZE_MB}MB)")
-    plt.xlabel("Number of Threads")
-    plt.ylabel("Speedup Factor")
-    plt.xticks(thread_counts)
-    plt.legend()
-    plt.grid(True)
+                          thread_counts: List[int], speedups: List[float],
+                          size_mb: int = FILE_SIZE_MB) -> str:
+    ax.clear()
+    ax.plot(thread_counts, speedups, marker="o", linestyle="-", label=impl_label)
+    ax.axhline(y=1.0, linestyle=":", label="Sequential baseline")
+    ax.set_title(f"Speedup: {impl_label} on {dataset_label} ({size_mb}MB)")
+    ax.set_xlabel("Number of Threads")
+    ax.set_ylabel("Speedup Factor")
+    ax.set_xticks(thread_counts)
+    ax.legend()
+    ax.grid(True)
     out_path = f"speedup_{impl_key}_{dataset_key}.png"
-    plt.savefig(out_path, bbox_inches="tight")
-    plt.close()
+    fig.savefig(out_path, dpi=100)
     return out_path
 
-def plot_speedup_comparison(dataset_key: str, dataset_label: str,
-                            results: Dict[str, List[float]], labels: Dict[str, str]) -> str:
-    plt.figure(figsize=(10, 6))
+def plot_speedup_comparison(fig: Figure, ax: Axes, dataset_key: str, dataset_label: str,
+                            results: Dict[str, List[float]], labels: Dict[str, str],
+                            thread_counts: List[int] = THREAD_COUNTS,
+                            size_mb: int = FILE_SIZE_MB) -> str:
+    ax.clear()
     for impl_key, speedups in results.items():
-        plt.plot(THREAD_COUNTS, speedups, marker="o", linestyle="-", label=labels[impl_key])
-    plt.axhline(y=1.0, linestyle=":", label="Sequential baseline")
-    plt.title(f"Speedup Comparison on {dataset_label} ({FILE_SIZE_MB}MB)")
-    plt.xlabel("Number of Threads")
-    plt.ylabel("Speedup Factor")
-    plt.xticks(THREAD_COUNTS)
-    plt.legend()
-    plt.grid(True)
+        ax.plot(thread_counts, speedups, marker="o", linestyle="-", label=labels[impl_key])
+    ax.axhline(y=1.0, linestyle=":", label="Sequential baseline")
+    ax.set_title(f"Speedup Comparison on {dataset_label} ({size_mb}MB)")
+    ax.set_xlabel("Number of Threads")
+    ax.set_ylabel("Speedup Factor")
+    ax.set_xticks(thread_counts)
+    ax.legend()
+    ax.grid(True)
     out_path = f"speedup_comparison_{dataset_key}.png"
-    plt.savefig(out_path, bbox_inches="tight")
-    plt.close()
+    fig.savefig(out_path, dpi=100)
     return out_path
 
+def plot_results(fig: Figure, ax: Axes, results: Dict) -> List[str]:
+    """Render every plot for one dataset's results (as written by save_results)."""
+    images: List[str] = []
+    impls = results["impls"]
+    for impl_key, impl in impls.items():
+        images.append(plot_speedup_for_impl(fig, ax, results["dataset"], results["label"],
+                                            impl_key, impl["label"], impl["threads"],
+                                            impl["speedups"], size_mb=results["size_mb"]))
+    first = next(iter(impls.values()))
+    images.append(plot_speedup_comparison(fig, ax, results["dataset"], results["label"],
+                                          {k: v["speedups"] for k, v in impls.items()},
+                                          {k: v["label"] for k, v in impls.items()},
+                                          thread_counts=first["threads"],
+                                          size_mb=results["size_mb"]))
+    return images
+
+def plot_from_json(paths: List[str]) -> List[str]:
+    """Re-render plots from saved results files without re-running the benchmark."""
+    images: List[str] = []
+    fig, ax = plt.subplots(figsize=(10, 6))
+    try:
+        for path in paths:
+            with open(path, "r") as f:
+                images.extend(plot_results(fig, ax, json.load(f)))
+    finally:
+        plt.close(fig)
+    return images
+
 # ---- Orchestrator ----
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark pczip parallel implementations.")
+    parser.add_argument("--cold", action="store_true",
+                        help="drop the OS page cache before every timed run (Linux, needs sudo)")
+    parser.add_argument("--plot-only", action="store_true",
+                        help="skip measurements and re-plot from saved results_*.json files")
+    return parser.parse_args()
+
 def main() -> None:
+    args = _parse_args()
+    if args.plot_only:
+        paths = [_results_path(k) for k, _ in DATASETS if os.path.exists(_results_path(k))]
+        if not paths:
+            raise SystemExit(1)
+        plot_from_json(paths)
+        return
+
     compile_go()
+    exe_digest = _fast_hash(GO_EXE)
+    start_server()
+    mode = _measurement_mode(args.cold)
+    print(f"measurement mode: {mode}")
 
     tracked_artifacts: List[str] = []
     images_written: List[str] = []
+    seq_cache = _load_seq_cache()
+    fig, ax = plt.subplots(figsize=(10, 6))
 
+    # why: sparse holes read back without disk I/O, so cold runs need the
+    # zero regions physically written to measure real input reads.
+    datasets = prepare_datasets(dense=args.cold)
     for dataset_key, dataset_label in DATASETS:
-        in_file = _dataset_path(dataset_key)
-        GENERATOR_BY_KEY[dataset_key](in_file, FILE_SIZE_MB)
-
-        # Baseline sequential for this dataset
-        seq_out = f"output_seq_{dataset_key}.pcz"
-        seq_time, _ = run_compress(in_file, "seq", 1, output_file=seq_out)
-        tracked_artifacts.append(seq_out)
+        in_file, digest = datasets[dataset_key]
+        orig_size = os.path.getsize(in_file)
 
-        if not verify_integrity(in_file, seq_out):
-            delete_all_pcz(tracked_artifacts)
-            raise SystemExit(1)
+        # Baseline sequential (cached per dataset, pczip build and measurement mode)
+        seq_key = _seq_cache_key(digest, exe_digest, mode)
+        seq_time: Optional[float] = seq_cache.get(seq_key)
+        if seq_time is None:
+            seq_out = f"output_seq_{dataset_key}.pcz"
+            if args.cold:
+                drop_page_cache()
+            else:
+                warm_page_cache(in_file)
+            seq_time, _ = run_compress(in_file, "seq", 1, output_file=seq_out, orig_size=orig_size)
+            tracked_artifacts.append(seq_out)
+
+            if not verify_integrity(in_file, seq_out, digest):
+                delete_all_pcz(tracked_artifacts)
+                raise SystemExit(1)
+            seq_cache[seq_key] = seq_time
+            _save_seq_cache(seq_cache)
 
         # Collect speedups
         speedups_by_impl: Dict[str, List[float]] = {}
         labels_by_impl: Dict[str, str] = {}
+        runs_by_impl: Dict[str, List[int]] = {}
 
         for impl_key, impl_label in PARALLEL_IMPLS:
             labels_by_impl[impl_key] = impl_label
             impl_speedups: List[float] = []
+            impl_runs: List[int] = []
 
             for t in THREAD_COUNTS:
-                total_time = 0.0
-                last_ratio = 0.0
-                for i in range(ITERATIONS):
+                if not args.cold:
+                    warm_page_cache(in_file)
+
+                # why: the seq run may be cached, so each impl's first output is
+                # round-trip checked too; it is verified after the cell so the
+                # check never sits between timed runs.
+                check_file = f"output_{impl_key}_{dataset_key}_{t}_0.pcz"
+                needs_check = t == THREAD_COUNTS[0]
+
+                def _timed_run(i: int) -> float:
+                    if args.cold:
+                        drop_page_cache()
                     out_file = f"output_{impl_key}_{dataset_key}_{t}_{i}.pcz"
-                    dur, ratio = run_compress(in_file, impl_key, t, output_file=out_file)
-                    total_time += dur
-                    last_ratio = ratio
-                    tracked_artifacts.append(out_file)
-                avg_time = total_time / ITERATIONS
+                    dur, _ = run_compress(in_file, impl_key, t, output_file=out_file, orig_size=orig_size)
+                    if needs_check and out_file == check_file:
+                        tracked_artifacts.append(out_file)
+                    elif os.path.exists(out_file):
+                        # why: dropping outputs right away keeps disk usage flat
+                        # and the input in page cache.
+                        os.remove(out_file)
+                    return dur
+
+                samples = _adaptive_runs(_timed_run)
+                if needs_check:
+                    if not verify_integrity(in_file, check_file, digest):
+                        delete_all_pcz(tracked_artifacts)
+                        raise SystemExit(1)
+                    os.remove(check_file)
+                avg_time = statistics.fmean(samples)
                 impl_speedups.append(seq_time / avg_time if avg_time > 0 else 0.0)
+                impl_runs.append(len(samples))
+                print(f"{dataset_key} {impl_key} threads={t}: "
+                      f"{avg_time:.3f}s avg over {len(samples)} runs")
 
             speedups_by_impl[impl_key] = impl_speedups
-            img = plot_speedup_for_impl(dataset_key, dataset_label, impl_key, impl_label, THREAD_COUNTS, impl_speedups)
-            images_written.append(img)
+            runs_by_impl[impl_key] = impl_runs
 
-        comp_img = plot_speedup_comparison(dataset_key, dataset_label, speedups_by_impl, labels_by_impl)
-        images_written.append(comp_img)
+        # why: results are saved before plotting so plots can be redone with --plot-only.
+        results = save_results(dataset_key, dataset_label, seq_time,
+                               speedups_by_impl, labels_by_impl, runs_by_impl, mode)
+        images_written.extend(plot_results(fig, ax, results))
 
+    plt.close(fig)
+    stop_server()
     delete_all_pcz(tracked_artifacts)
 
 if __name__ == "__main__":
@@ -1,52 +1,147 @@
 package main
 
 import (
+	"bufio"
+	"encoding/json"
 	"flag"
+	"fmt"
+	"io"
 	"os"
+	"runtime"
+	"runtime/debug"
+	"time"
 
 	"proj3/core"
 )
 
-func main() {
-	mode := flag.String("mode", "", "Mode: compress or decompress")
-	inPath := flag.String("in", "", "Input file path")
-	outPath := flag.String("out", "", "Output file path")
-	impl := flag.String("impl", "seq", "Implementation: seq, bsp, or ws")
-	threads := flag.Int("threads", 4, "Number of worker threads for parallel implementations")
+// job describes one compress/decompress request, from flags or from -server.
+type job struct {
+	Mode    string `json:"mode"`
+	In      string `json:"in"`
+	Out     string `json:"out"`
+	Impl    string `json:"impl"`
+	Threads int    `json:"threads"`
 
-	flag.Parse()
+	// MaxProcs, if set, is applied with runtime.GOMAXPROCS before a
+	// -server job runs (the CLI uses the GOMAXPROCS env var instead).
+	MaxProcs int `json:"gomaxprocs,omitempty"`
+}
 
-	if *mode == "" || *inPath == "" || *outPath == "" {
-		os.Exit(1)
-	}
+// reply is written to stdout after each job, by both the CLI and -server.
+type reply struct {
+	ElapsedNS int64  `json:"elapsed_ns"`
+	CompBytes int64  `json:"comp_bytes,omitempty"`
+	Error     string `json:"error,omitempty"`
+}
 
-	switch *mode {
+func runJob(j job) error {
+	switch j.Mode {
 	case "compress":
-		switch *impl {
+		switch j.Impl {
 		case "seq":
-			core.SequentialCompressFile(*inPath, *outPath)
+			return core.SequentialCompressFile(j.In, j.Out)
 		case "bsp":
-			core.BSPCompressFile(*inPath, *outPath, *threads)
+			return core.BSPCompressFile(j.In, j.Out, j.Threads)
 		case "ws":
-			core.WorkStealingCompressFile(*inPath, *outPath, *threads)
-		default:
-			os.Exit(1)
+			return core.WorkStealingCompressFile(j.In, j.Out, j.Threads)
 		}
 
 	case "decompress":
-		switch *impl {
+		switch j.Impl {
 		case "seq":
-			core.SequentialDecompressFile(*inPath, *outPath)
+			return core.SequentialDecompressFile(j.In, j.Out)
 		case "bsp":
-			core.BSPDecompressFile(*inPath, *outPath, *threads)
+			return core.BSPDecompressFile(j.In, j.Out, j.Threads)
 		case "ws":
-			core.WorkStealingDecompressFile(*inPath, *outPath, *threads)
-		default:
-			os.Exit(1)
+			return core.WorkStealingDecompressFile(j.In, j.Out, j.Threads)
 		}
 
 	default:
+		return fmt.Errorf("unknown mode %q", j.Mode)
+	}
+	return fmt.Errorf("unknown impl %q", j.Impl)
+}
+
+// timeJob runs j and reports the time spent in the job itself, excluding
+// process startup. Compress jobs also report the output size so callers
+// don't have to stat it.
+func timeJob(j job) reply {
+	start := time.Now()
+	err := runJob(j)
+	res := reply{ElapsedNS: time.Since(start).Nanoseconds()}
+	if err != nil {
+		res.Error = err.Error()
+		return res
+	}
+	if j.Mode == "compress" {
+		if info, err := os.Stat(j.Out); err == nil {
+			res.CompBytes = info.Size()
+		}
+	}
+	return res
+}
+
+// serve reads newline-delimited JSON jobs from r and writes one reply per job
+// to w. A {"ready":true} line is written first so callers can detect support.
+func serve(r io.Reader, w io.Writer) error {
+	enc := json.NewEncoder(w)
+	if err := enc.Encode(map[string]bool{"ready": true}); err != nil {
+		return err
+	}
+
+	sc := bufio.NewScanner(r)
+	for sc.Scan() {
+		line := sc.Bytes()
+		if len(line) == 0 {
+			continue
+		}
+
+		var res reply
+		j := job{Mode: "compress", Impl: "seq", Threads: 4}
+		if err := json.Unmarshal(line, &j); err != nil {
+			res.Error = fmt.Sprintf("decode job: %v", err)
+		} else {
+			if j.MaxProcs > 0 {
+				runtime.GOMAXPROCS(j.MaxProcs)
+			}
+			// Start every timed job from a collected heap so garbage left
+			// by earlier jobs isn't billed to this one.
+			runtime.GC()
+			debug.FreeOSMemory()
+			res = timeJob(j)
+		}
+		if err := enc.Encode(res); err != nil {
+			return err
+		}
+	}
+	return sc.Err()
+}
+
+func main() {
+	mode := flag.String("mode", "", "Mode: compress or decompress")
+	inPath := flag.String("in", "", "Input file path")
+	outPath := flag.String("out", "", "Output file path")
+	impl := flag.String("impl", "seq", "Implementation: seq, bsp, or ws")
+	threads := flag.Int("threads", 4, "Number of worker threads for parallel implementations")
+	server := flag.Bool("server", false, "Serve newline-delimited JSON jobs on stdin/stdout")
+
+	flag.Parse()
+
+	if *server {
+		if err := serve(os.Stdin, os.Stdout); err != nil {
+			os.Exit(1)
+		}
+		return
+	}
+
+	if *mode == "" || *inPath == "" || *outPath == "" {
 		os.Exit(1)
 	}
 
+	j := job{Mode: *mode, In: *inPath, Out: *outPath, Impl: *impl, Threads: *threads}
+	res := timeJob(j)
+	if res.Error != "" {
+		os.Exit(1)
+	}
+	_ = json.NewEncoder(os.Stdout).Encode(res)
 }
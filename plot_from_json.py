@@ -0,0 +1,16 @@
+# file: plot_from_json.py
+"""Re-render speedup plots from results_*.json written by benchmark.py."""
+import glob
+import sys
+
+from benchmark import plot_from_json
+
+def main() -> None:
+    paths = sys.argv[1:] or sorted(glob.glob("results_*.json"))
+    if not paths:
+        raise SystemExit(1)
+    for image in plot_from_json(paths):
+        print(image)
+
+if __name__ == "__main__":
+    main()